@@ -0,0 +1,176 @@
+import sys
+from collections import defaultdict
+from F import load_grammar
+from grammar_utils import normalize_grammar, print_normalization_report
+
+
+class EarleyAnalyzer:
+    """
+    General context-free recognizer (Earley, with the Aycock-Horspool
+    treatment of nullable non-terminals). Handles ambiguous and
+    left-recursive grammars in O(n³) time, O(n²) for unambiguous ones.
+
+    Items are (production id, dot, origin) tuples. Each Earley set keeps an
+    index of the items waiting on every non-terminal, so completion only
+    visits the items it can advance.
+    """
+
+    def __init__(self, productions, start_symbol):
+        self.start_symbol = start_symbol
+        self.non_terminals = set(productions.keys())
+        # production id -> (lhs, rhs) with epsilon stored as an empty rhs
+        self.production_list = []
+        self.prods_by_nt = defaultdict(list)
+        for nt, prods in productions.items():
+            for prod in prods:
+                rhs = () if tuple(prod) == ('e',) else tuple(prod)
+                self.prods_by_nt[nt].append(len(self.production_list))
+                self.production_list.append((nt, rhs))
+        self.nullable = self._compute_nullable()
+
+    def _compute_nullable(self):
+        nullable = set()
+        changed = True
+        while changed:
+            changed = False
+            for lhs, rhs in self.production_list:
+                if lhs not in nullable and all(sym in nullable for sym in rhs):
+                    nullable.add(lhs)
+                    changed = True
+        return nullable
+
+    def _parse(self, tokens):
+        n = len(tokens)
+        sets = [set() for _ in range(n + 1)]
+        waiting = [defaultdict(list) for _ in range(n + 1)]
+
+        for pid in self.prods_by_nt[self.start_symbol]:
+            sets[0].add((pid, 0, 0))
+
+        for j in range(n + 1):
+            agenda = list(sets[j])
+            predicted = set()
+            current = tokens[j] if j < n else None
+
+            while agenda:
+                item = agenda.pop()
+                pid, dot, origin = item
+                lhs, rhs = self.production_list[pid]
+
+                if dot < len(rhs):
+                    sym = rhs[dot]
+                    if sym in self.non_terminals:
+                        waiting[j][sym].append(item)
+                        if sym not in predicted:
+                            predicted.add(sym)
+                            for new_pid in self.prods_by_nt[sym]:
+                                new_item = (new_pid, 0, j)
+                                if new_item not in sets[j]:
+                                    sets[j].add(new_item)
+                                    agenda.append(new_item)
+                        if sym in self.nullable:
+                            new_item = (pid, dot + 1, origin)
+                            if new_item not in sets[j]:
+                                sets[j].add(new_item)
+                                agenda.append(new_item)
+                    elif sym == current:
+                        sets[j + 1].add((pid, dot + 1, origin))
+                else:
+                    for w_pid, w_dot, w_origin in waiting[origin][lhs]:
+                        new_item = (w_pid, w_dot + 1, w_origin)
+                        if new_item not in sets[j]:
+                            sets[j].add(new_item)
+                            agenda.append(new_item)
+
+            if j < n and not sets[j + 1]:
+                return sets, False
+
+        accepted = any(
+            dot == len(self.production_list[pid][1]) and origin == 0
+            for pid, dot, origin in sets[n]
+            if self.production_list[pid][0] == self.start_symbol
+        )
+        return sets, accepted
+
+    def validate_string(self, input_string, build_forest=False):
+        """
+        Recognizes input_string. The shared packed parse forest is only built
+        when build_forest is True.
+
+        Returns:
+            tuple: (valid, message, forest)
+                - forest: dict or None, see build_forest
+        """
+        tokens = list(input_string.strip())
+        sets, accepted = self._parse(tokens)
+        if not accepted:
+            return False, "Syntax Error", None
+        forest = self.build_forest(tokens, sets) if build_forest else None
+        return True, "Valid Input", forest
+
+    def build_forest(self, tokens, sets):
+        """
+        Builds a binarized shared packed parse forest from the Earley sets.
+
+        Nodes are (symbol, start, end) for symbols and (production id, dot,
+        start, end) for partially recognized productions. The result maps
+        every node reachable from the root to its list of packed
+        alternatives, each a (left, right) pair of child nodes (left is None
+        at the first symbol of a production). Terminal nodes have no entry.
+        """
+        n = len(tokens)
+        completed = defaultdict(set)  # (lhs, end) -> origins
+        for end, items in enumerate(sets):
+            for pid, dot, origin in items:
+                lhs, rhs = self.production_list[pid]
+                if dot == len(rhs):
+                    completed[(lhs, end)].add(origin)
+
+        def symbol_exists(sym, start, end):
+            if sym in self.non_terminals:
+                return start in completed[(sym, end)]
+            return end == start + 1 and tokens[start] == sym
+
+        forest = {}
+        root = (self.start_symbol, 0, n)
+        pending = [root]
+        while pending:
+            node = pending.pop()
+            if node in forest:
+                continue
+            packed = []
+            if len(node) == 3:
+                sym, start, end = node
+                for pid in self.prods_by_nt[sym]:
+                    if (pid, len(self.production_list[pid][1]), start) in sets[end]:
+                        packed.append((None, (pid, len(self.production_list[pid][1]), start, end)))
+            else:
+                pid, dot, start, end = node
+                rhs = self.production_list[pid][1]
+                if dot == 0:
+                    packed.append((None, None))
+                else:
+                    sym = rhs[dot - 1]
+                    for mid in range(start, end + 1):
+                        if (pid, dot - 1, start) in sets[mid] and symbol_exists(sym, mid, end):
+                            packed.append(((pid, dot - 1, start, mid), (sym, mid, end)))
+            forest[node] = packed
+            for left, right in packed:
+                for child in (left, right):
+                    if child is not None and child not in forest and (len(child) == 4 or child[0] in self.non_terminals):
+                        pending.append(child)
+        return forest
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Uso: python E.py g.txt")
+        sys.exit(1)
+
+    prods, start, cadenas = load_grammar(sys.argv[1])
+    prods, report = normalize_grammar(prods, start)
+    print_normalization_report(report)
+    parser = EarleyAnalyzer(prods, start)
+    for cadena in cadenas:
+        valid, msg, _ = parser.validate_string(cadena)
+        print(f"{cadena}: {msg}")
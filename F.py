@@ -1,8 +1,9 @@
 import sys
 from collections import defaultdict
-from tabulate import tabulate
-from grammar_utils import compute_terminals, compute_first, compute_follow,  print_first_follow, print_grammar
-from table_utils import create_fancy_table, TableColors, color_text
+from grammar_utils import read_grammar_lines, compute_terminals, compute_first, compute_follow,  print_first_follow, print_grammar, normalize_grammar, print_normalization_report
+from table_utils import create_fancy_table, create_trace_table, TableColors, color_text, init_colors
+from trace_utils import ParseTrace, MATCH, EXPAND, ERROR
+from input_utils import mapped_input, terminal_code, END
 
 class LL1Analyzer:  # antes era GrammarAnalyzer
     def __init__(self, productions, start_symbol):
@@ -12,7 +13,11 @@ class LL1Analyzer:  # antes era GrammarAnalyzer
         self.terminals = compute_terminals(productions, self.non_terminals)  
         self.first = compute_first(productions, self.non_terminals)         
         self.follow = compute_follow(productions, self.non_terminals, start_symbol, self.first) 
+        # Production ids used by the compact parse trace
+        self.production_list = [(nt, prod) for nt in productions for prod in productions[nt]]
+        self._prod_ids = {(nt, tuple(prod)): i for i, (nt, prod) in enumerate(self.production_list)}
         self.ll1_table = self._build_ll1_table()
+        self._byte_table = None
 
     def is_ll1_grammar(self):
         """
@@ -120,60 +125,92 @@ class LL1Analyzer:  # antes era GrammarAnalyzer
                         table[(nt, follow_sym)] = prod
         return table
 
-    def validate_string(self, input_string):
+    def validate_string(self, input_string, trace=True, verbose=False):
+        """
+        Returns (valid, message, trace). Nothing is printed unless verbose is
+        set, in which case the trace table and the verdict are shown.
+        """
         if not self.ll1_table:
-            return False, "Grammar not LL(1)", []
+            return False, "Grammar not LL(1)", None
 
         tokens = list(input_string.strip())
         tokens.append('$')
         stack = ['$', self.start_symbol]
         idx = 0
-        steps = []
+        steps = ParseTrace('ll1', tokens, self.production_list, self.start_symbol) if trace else None
 
         while stack:
             top = stack[-1]
             current = tokens[idx]
-            steps.append([
-                color_text(str(len(steps)+1), TableColors.MAGENTA),
-                color_text(' '.join(stack[::-1]), TableColors.CYAN),
-                color_text(' '.join(tokens[idx:]), TableColors.GREEN)
-            ])
 
             if top == current:
+                if steps is not None:
+                    steps.record(MATCH, len(stack), idx)
                 stack.pop()
                 idx += 1
             elif top in self.non_terminals and (top, current) in self.ll1_table:
                 prod = self.ll1_table[(top, current)]
+                if steps is not None:
+                    steps.record(EXPAND, len(stack), idx, self._prod_ids[(top, tuple(prod))])
                 stack.pop()
                 if prod != ['e']:
                     stack.extend(reversed(prod))
             else:
-                print(create_fancy_table(steps, 
-                    ["STEP", "STACK", "INPUT"], 
-                    "VALIDATION PROCESS"))
-                print(f"\n{color_text('❌ NO', TableColors.RED, bold=True)} - Input Rejected")
+                if steps is not None:
+                    steps.record(ERROR, len(stack), idx)
+                if verbose:
+                    print_verdict(steps, False)
                 return False, "Syntax Error", steps
 
-        print(create_fancy_table(steps, 
-            ["STEP", "STACK", "INPUT"], 
-            "VALIDATION PROCESS"))
-        if idx >= len(tokens):
-            print(f"\n{color_text('✓ YES', TableColors.GREEN, bold=True)} - Input Accepted")
+        valid = idx >= len(tokens)
+        if verbose:
+            print_verdict(steps, valid)
+        if valid:
             return True, "Valid Input", steps
         else:
-            print(f"\n{color_text('❌ NO', TableColors.RED, bold=True)} - Input Rejected")
             return False, "Invalid Input", steps
 
-def load_grammar(file_path):
-    with open(file_path, 'r') as f:
-        lines = [line.strip() for line in f if line.strip()]
+    def _build_byte_table(self):
+        # nt -> {byte code: production reversed, with terminals as byte codes}
+        table = defaultdict(dict)
+        for (nt, term), prod in self.ll1_table.items():
+            encoded = [] if prod == ['e'] else [
+                sym if sym in self.non_terminals else terminal_code(sym) for sym in reversed(prod)]
+            table[nt][terminal_code(term)] = encoded
+        return table
 
-    num_nt = int(lines[0])
+    def validate_file(self, file_path):
+        """
+        Validates the contents of file_path as a single input string without
+        reading it into memory: the file is memory-mapped and tokens are
+        matched as bytes, so every terminal must be a single byte.
+        """
+        if not self.ll1_table:
+            return False, "Grammar not LL(1)", None
+        if self._byte_table is None:
+            self._byte_table = self._build_byte_table()
+        table = self._byte_table
+
+        with mapped_input(file_path) as (data, pos, end):
+            stack = [END, self.start_symbol]
+            while stack:
+                top = stack.pop()
+                current = data[pos] if pos < end else END
+                if top == current:
+                    pos += 1
+                elif top in table and current in table[top]:
+                    stack.extend(table[top][current])
+                else:
+                    return False, "Syntax Error", None
+        return True, "Valid Input", None
+
+def load_grammar(file_path):
+    num_nt, production_lines, test_strings, _ = read_grammar_lines(file_path)
     prods = defaultdict(list)
     start_symbol = None
 
     #First look for 'S' as the initial symbol
-    for line in lines[1:num_nt+1]:
+    for line in production_lines:
         if '->' in line:
             left = line.split('->')[0].strip()
             if left == 'S':
@@ -182,12 +219,12 @@ def load_grammar(file_path):
 
    #If no 'S' was found, use the first one as before
     if start_symbol is None:
-        for line in lines[1:num_nt+1]:
+        for line in production_lines:
             if '->' in line:
                 start_symbol = line.split('->')[0].strip()
                 break
 
-    for line in lines[1:num_nt+1]:
+    for line in production_lines:
         if '->' not in line: continue
         left, right = line.split('->')
         left = left.strip()
@@ -237,7 +274,6 @@ def load_grammar(file_path):
                         # If all symbols were 'e', add a single 'e' production
                         prods[left].append(['e'])
 
-    test_strings = lines[num_nt+1:]
     return prods, start_symbol, test_strings
 
 def print_info(analyzer):
@@ -277,20 +313,27 @@ def print_info(analyzer):
             [color_text(t, TableColors.BLUE, bold=True) for t in all_terms],
             "LL(1) PARSING TABLE"))
 
+def print_verdict(steps, valid):
+    if steps is not None:
+        print(create_trace_table(steps, "VALIDATION PROCESS"))
+    if valid:
+        print(f"\n{color_text('✓ YES', TableColors.GREEN, bold=True)} - Input Accepted")
+    else:
+        print(f"\n{color_text('❌ NO', TableColors.RED, bold=True)} - Input Rejected")
+
 def print_parse_steps(steps):
-    print("\n" + create_fancy_table(
-        steps,
-        ["STEP", "STACK", "INPUT"],
-        "PARSING STEPS"
-    ))
+    print("\n" + create_trace_table(steps, "PARSING STEPS"))
 
 def main():
     if len(sys.argv) != 2:
         print("Uso: python grammar_analyzer.py <archivo_gramatica>")
         return
 
+    init_colors()
     try:
         prods, start, test_strings = load_grammar(sys.argv[1])
+        prods, report = normalize_grammar(prods, start)
+        print_normalization_report(report)
         analyzer = LL1Analyzer(prods, start)
 
         print_info(analyzer)
@@ -300,7 +343,7 @@ def main():
             for string in test_strings:
                 if not string.strip(): continue
                 print(f"\nString: '{string}'")
-                valid, msg, steps = analyzer.validate_string(string)
+                valid, msg, steps = analyzer.validate_string(string, verbose=True)
                 print("\nAnalysis steps:")
                 print_parse_steps(steps)
                 print(f"\nResult: {msg}")
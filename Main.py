@@ -1,15 +1,64 @@
 import sys
 import io
+from itertools import chain, islice
 from F import LL1Analyzer, load_grammar as ll1_load_grammar
 from S import SyntaxAnalyzer, load_grammar as slr_load_grammar
-from table_utils import create_fancy_table, TableColors, color_text, create_result_box
+from E import EarleyAnalyzer
+from table_utils import create_fancy_table, TableColors, color_text, create_result_box, init_colors
+from grammar_utils import normalize_grammar, print_normalization_report
+from cache_utils import ResultCache, grammar_fingerprint, cache_path
+from benchmark import calibrate_engines
+
+
+def analyze_strings(strings, validate, cache=None, fingerprint=None, result_box=True):
+    """
+    Validates every test string with validate(string) -> (valid, message),
+    which prints its own analysis. Verdicts already in the cache are printed
+    without parsing the string again. With result_box=False (the SLR parser
+    prints its own verdict) only cached verdicts get a result box.
+    """
+    for string in strings:
+        if not string.strip(): continue
+        string = string.strip()
+        if result_box:
+            print(f"\nInput: {color_text(string, TableColors.CYAN)}")
+        if cache is None:
+            valid, msg = validate(string)
+            cached = False
+        else:
+            valid, msg, cached = cache.validate(fingerprint, string, validate)
+        if cached:
+            if not result_box:
+                print(f"\nInput: {color_text(string, TableColors.CYAN)}")
+            create_result_box(valid, msg + " (cached)")
+        elif result_box:
+            create_result_box(valid, msg)
+
+
+def validate_ll1(analyzer, string, verbose=True):
+    # verbose prints the trace table and the verdict; otherwise the input is validated untraced
+    return analyzer.validate_string(string, trace=verbose, verbose=verbose)[:2]
+
 
+def validate_slr(slr_parser, string, verbose=True):
+    valid = slr_parser.validate_input(string, trace=verbose, verbose=verbose)
+    return valid, "Input Accepted" if valid else "Syntax Error"
 
 
-def main(grammar_file):
+def main(grammar_file, use_cache=False, auto=False, calibration_size=20):
+    init_colors()
+    cache = None
+    if use_cache:
+        cache = ResultCache()
+        cache.load(cache_path(grammar_file))
+    # The normalization report is printed by whichever loader succeeds first
+    normalization_reported = False
     # First try to load with F (LL1)
     try:
         ll1_prods, ll1_start_symbol, ll1_test_strings = ll1_load_grammar(grammar_file)
+        ll1_prods, report = normalize_grammar(ll1_prods, ll1_start_symbol)
+        print_normalization_report(report)
+        normalization_reported = True
         analyzer = LL1Analyzer(ll1_prods, ll1_start_symbol)
 
         # Temporarily suppress standard output
@@ -35,12 +84,15 @@ def main(grammar_file):
 
     # Then try with S (SLR)
     try:
-        slr_prods, slr_start_symbol, slr_test_strings = slr_load_grammar(grammar_file)
+        slr_prods, slr_start_symbol, slr_test_strings, slr_precedence = slr_load_grammar(grammar_file)
+        slr_prods, report = normalize_grammar(slr_prods, slr_start_symbol)
+        if not normalization_reported:
+            print_normalization_report(report)
         orig_stdout = sys.stdout
         sys.stdout = io.StringIO()
 
         # Create the SLR parser
-        slr_parser = SyntaxAnalyzer(slr_prods, slr_start_symbol)
+        slr_parser = SyntaxAnalyzer(slr_prods, slr_start_symbol, precedence=slr_precedence)
         is_slr1 = slr_parser.is_slr1()
 
         result = sys.stdout.getvalue()
@@ -62,32 +114,51 @@ def main(grammar_file):
         print(color_text("Grammar is both LL(1) and SLR(1)", TableColors.YELLOW, bold=True))
         print(color_text("═"*50, TableColors.BLUE) + "\n")
 
-        while True:
+        mode = 'A' if auto else None
+        verbose = True
+        while mode is None:
             print(create_fancy_table([
                 ["T", "Use LL(1) Parser"],
                 ["B", "Use SLR(1) Parser"],
+                ["A", "Pick the faster parser automatically"],
                 ["Q", "Quit Program"]
             ], ["Option", "Action"], "Parser Selection"))
             
-            mode = input("\nSelect parser type (T/B/Q): ").strip().upper()
-            if mode in {'Q', 'T', 'B'}:
+            mode = input("\nSelect parser type (T/B/A/Q): ").strip().upper()
+            if mode in {'Q', 'T', 'B', 'A'}:
                 break
             print(color_text("Invalid option! Try again.", TableColors.RED))
+            mode = None
 
         if mode == 'Q':
             return
 
+        if mode == 'A':
+            # Calibrate on the first strings, then put them back in front of the streams.
+            # The batch then runs untraced, as calibrated, with a result box per string.
+            sample = [string.strip() for string in islice(ll1_test_strings, calibration_size) if string.strip()]
+            ll1_test_strings = chain(sample, ll1_test_strings)
+            slr_test_strings = chain(list(islice(slr_test_strings, calibration_size)), slr_test_strings)
+            costs = calibrate_engines([
+                ('T', lambda string: validate_ll1(analyzer, string, verbose=False)),
+                ('B', lambda string: validate_slr(slr_parser, string, verbose=False)),
+            ], sample)
+            names = {'T': "LL(1)", 'B': "SLR(1)"}
+            print(create_fancy_table(
+                [[names[name], f"{cost * 1e6:.2f}"] for name, cost in costs],
+                ["Parser", "µs/token"], f"CALIBRATION ({len(sample)} strings)"))
+            mode = costs[0][0]
+            verbose = False
+            print(color_text(f"\nUsing {names[mode]} Parser (fastest on the sample)", TableColors.CYAN, bold=True))
+
         if mode == 'T':
             print("\n" + color_text("LL(1) PARSER EXECUTION", TableColors.CYAN, bold=True))
             from F import print_info as ll1_print_info
             ll1_print_info(analyzer)
 
             print("\n" + color_text("STRING ANALYSIS", TableColors.YELLOW, bold=True))
-            for string in ll1_test_strings:
-                if not string.strip(): continue
-                print(f"\nInput: {color_text(string, TableColors.CYAN)}")
-                valid, msg, steps = analyzer.validate_string(string.strip())
-                create_result_box(valid, msg)
+            analyze_strings(ll1_test_strings, lambda string: validate_ll1(analyzer, string, verbose),
+                            cache, grammar_fingerprint(ll1_prods, ll1_start_symbol, 'll1'))
 
         else:
             print("\n" + color_text("SLR(1) PARSER EXECUTION", TableColors.CYAN, bold=True))
@@ -99,20 +170,17 @@ def main(grammar_file):
             slr_parser.print_reductions()
 
             print("\n" + color_text("STRING ANALYSIS", TableColors.YELLOW, bold=True))
-            for string in slr_test_strings:
-                if not string.strip(): continue
-                slr_parser.validate_input(string.strip())
+            analyze_strings(slr_test_strings, lambda string: validate_slr(slr_parser, string, verbose),
+                            cache, grammar_fingerprint(slr_prods, slr_start_symbol, 'slr', slr_precedence),
+                            result_box=not verbose)
 
     elif is_ll1:
         print(color_text("\nUsing LL(1) Parser", TableColors.CYAN, bold=True))
         from F import print_info as ll1_print_info
         ll1_print_info(analyzer)
         print("\n" + color_text("STRING ANALYSIS", TableColors.YELLOW, bold=True))
-        for string in ll1_test_strings:
-            if not string.strip(): continue
-            print(f"\nInput: {color_text(string, TableColors.CYAN)}")
-            valid, msg, steps = analyzer.validate_string(string.strip())
-            create_result_box(valid, msg)
+        analyze_strings(ll1_test_strings, lambda string: validate_ll1(analyzer, string),
+                        cache, grammar_fingerprint(ll1_prods, ll1_start_symbol, 'll1'))
 
     elif is_slr1:
         print(color_text("\nUsing SLR(1) Parser", TableColors.CYAN, bold=True))
@@ -124,14 +192,29 @@ def main(grammar_file):
         slr_parser.print_reductions()
 
         print("\n" + color_text("STRING ANALYSIS", TableColors.YELLOW, bold=True))
-        for string in slr_test_strings:
-            if not string.strip(): continue
-            slr_parser.validate_input(string.strip())
+        analyze_strings(slr_test_strings, lambda string: validate_slr(slr_parser, string),
+                        cache, grammar_fingerprint(slr_prods, slr_start_symbol, 'slr', slr_precedence),
+                        result_box=False)
     else:
         print(color_text("\n❌ Grammar is neither LL(1) nor SLR(1)", TableColors.RED, bold=True))
+        try:
+            earley_parser = EarleyAnalyzer(ll1_prods, ll1_start_symbol)
+        except Exception as e:
+            print(color_text(f"Error loading grammar for Earley: {str(e)}", TableColors.RED))
+            return
+        print(color_text("\nUsing Earley Parser (general CFG)", TableColors.CYAN, bold=True))
+        print("\n" + color_text("STRING ANALYSIS", TableColors.YELLOW, bold=True))
+        analyze_strings(ll1_test_strings, lambda string: earley_parser.validate_string(string)[:2],
+                        cache, grammar_fingerprint(ll1_prods, ll1_start_symbol, 'earley'))
+
+    if cache is not None:
+        cache.save(cache_path(grammar_file))
+        print(color_text(f"\nCache: {cache.hits} hits, {cache.misses} misses", TableColors.BLUE))
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print(color_text("Usage: python Main.py <grammar_file>", TableColors.YELLOW))
+    flags = {'--cache', '--auto'}
+    args = [arg for arg in sys.argv[1:] if arg not in flags]
+    if len(args) != 1:
+        print(color_text("Usage: python Main.py <grammar_file> [--cache] [--auto]", TableColors.YELLOW))
         sys.exit(1)
-    main(sys.argv[1])
\ No newline at end of file
+    main(args[0], use_cache='--cache' in sys.argv[1:], auto='--auto' in sys.argv[1:])
\ No newline at end of file
@@ -1,18 +1,99 @@
+from array import array
 from collections import defaultdict
-from tabulate import tabulate
-from grammar_utils import compute_terminals, compute_first, compute_follow, print_first_follow, print_grammar
-from table_utils import create_fancy_table, TableColors, color_text
+from grammar_utils import read_grammar_lines, parse_precedence, compute_terminals, compute_first, compute_follow, print_first_follow, print_grammar, normalize_grammar, print_normalization_report
+from table_utils import create_fancy_table, create_trace_table, TableColors, color_text, init_colors
+from trace_utils import ParseTrace, SHIFT, REDUCE, ACCEPT, ERROR
+from input_utils import mapped_input, terminal_code, END
+
+
+def closure_ids(kernel, item_info, start_items):
+    """Closure of a kernel, as a set of item ids."""
+    closure = set(kernel)
+    pending = list(kernel)
+    while pending:
+        lhs, rhs, dot = item_info[pending.pop()]
+        if dot < len(rhs) and rhs[dot] in start_items:
+            for item in start_items[rhs[dot]]:
+                if item not in closure:
+                    closure.add(item)
+                    pending.append(item)
+    return closure
+
+
+def successor_kernels(closure, item_info):
+    """Returns the successor kernels of a closure as a list of (symbol, kernel) sorted by symbol."""
+    groups = defaultdict(list)
+    for item in closure:
+        lhs, rhs, dot = item_info[item]
+        if dot < len(rhs):
+            groups[rhs[dot]].append(item + 1)  # Same production, dot moved one symbol
+    return [(symbol, array('I', sorted(groups[symbol]))) for symbol in sorted(groups)]
+
+
+# Item tables shared by the worker processes of the parallel state construction
+_worker_items = None
+
+
+def _init_state_worker(item_info, start_items):
+    global _worker_items
+    _worker_items = (item_info, start_items)
+
+
+def _expand_kernels(kernels):
+    item_info, start_items = _worker_items
+    return [successor_kernels(closure_ids(kernel, item_info, start_items), item_info) for kernel in kernels]
+
+
+class StateView:
+    """
+    Read-only sequence over the LR(0) states. Only kernels are stored; each
+    access materializes the full closure as a frozenset of (lhs, rhs, dot).
+    """
+
+    def __init__(self, analyzer):
+        self._analyzer = analyzer
+
+    def __len__(self):
+        return len(self._analyzer._kernel_offsets) - 1
+
+    def __getitem__(self, state_id):
+        return self._analyzer.state_closure(state_id)
+
+    def __iter__(self):
+        for state_id in range(len(self)):
+            yield self[state_id]
 
 
 class SyntaxAnalyzer:  # antes era SLRParser
-    def __init__(self, productions, start_symbol):
+    def __init__(self, productions, start_symbol, workers=None, precedence=None, eliminate_units=False):
         self.productions = {k: [tuple(p) for p in v] for k, v in productions.items()}
         self.original_start_symbol = start_symbol
         self.start_symbol = start_symbol
         self.non_terminals = set(self.productions.keys())
         self.terminals = compute_terminals(self.productions, self.non_terminals)  
         self._augment_grammar()
-        self.states = []
+        # Production numbers as used in the table: numbered_productions[n] is (lhs, rhs) of rn
+        self.numbered_productions = [None] + [(nt, prod) for nt, prods in self.productions.items() for prod in prods]
+        self._prod_numbers = {}
+        for number in range(len(self.numbered_productions) - 1, 0, -1):
+            self._prod_numbers[self.numbered_productions[number]] = number
+        self._index_items()
+        self.last_trace = None
+        self._byte_tables = None
+        self._slr_table = None
+        self.workers = workers  # Processes used to build the LR(0) states (None = sequential)
+        self.precedence = precedence or {}  # terminal -> (level, associativity)
+        # Skip unit reductions (A -> B) by jumping straight to the end of goto chains
+        self.eliminate_units = eliminate_units
+        self._unit_gotos = None
+        self._state_symbols = None
+        # Kernels of all states as sorted item ids, concatenated in one array;
+        # state i owns _kernel_items[_kernel_offsets[i]:_kernel_offsets[i + 1]]
+        self._kernel_items = array('I')
+        self._kernel_offsets = array('I', [0])
+        self._kernel_index = {}  # Hash of a kernel -> state id
+        self._kernel_collisions = {}  # Kernel bytes -> state id, for kernels whose hash is taken
+        self.states = StateView(self)
         self.transitions = {}
         self._build_states()
         self.first = compute_first(self.productions, self.non_terminals)         
@@ -24,58 +105,106 @@ class SyntaxAnalyzer:  # antes era SLRParser
         self.start_symbol = augmented_start
         self.non_terminals.add(augmented_start)
 
-    def _closure(self, items):
-        closure_set = set(items)
-        added = True
-        while added:
-            added = False
-            new_items = set()
-            for lhs, rhs, dot in closure_set:
-                if dot < len(rhs):
-                    symbol = rhs[dot]
-                    if symbol in self.non_terminals:
-                        for prod in self.productions[symbol]:
-                            item = (symbol, prod, 0)
-                            if item not in closure_set:
-                                new_items.add(item)
-            if new_items:
-                closure_set.update(new_items)
-                added = True
-        return frozenset(closure_set)
-
-    def _goto(self, state, symbol):
-        goto_set = set()
-        for lhs, rhs, dot in state:
-            if dot < len(rhs) and rhs[dot] == symbol:
-                goto_set.add((lhs, rhs, dot + 1))
-        return self._closure(goto_set) if goto_set else None
+    def _index_items(self):
+        # Item ids: the items of production n are _item_base[n] + dot
+        self._item_base = [0] * len(self.numbered_productions)
+        self._item_info = []  # item id -> (lhs, rhs, dot)
+        self._start_items = defaultdict(list)  # nt -> ids of its items with the dot at 0
+        for number in range(1, len(self.numbered_productions)):
+            lhs, rhs = self.numbered_productions[number]
+            self._item_base[number] = len(self._item_info)
+            self._start_items[lhs].append(len(self._item_info))
+            for dot in range(len(rhs) + 1):
+                self._item_info.append((lhs, rhs, dot))
+        self._start_items = dict(self._start_items)
+
+    def kernel(self, state_id):
+        return self._kernel_items[self._kernel_offsets[state_id]:self._kernel_offsets[state_id + 1]]
+
+    def state_closure(self, state_id):
+        closure = closure_ids(self.kernel(state_id), self._item_info, self._start_items)
+        return frozenset(self._item_info[item] for item in closure)
+
+    def state_items(self, state_id):
+        """Closure items of a state in production order, for display."""
+        closure = closure_ids(self.kernel(state_id), self._item_info, self._start_items)
+        return [self._item_info[item] for item in sorted(closure)]
+
+    def _add_kernel(self, kernel):
+        """Returns (state id, is_new) for a kernel, registering it if unseen."""
+        data = kernel.tobytes()
+        key = hash(data)
+        state_id = self._kernel_index.get(key)
+        if state_id is not None:
+            if self.kernel(state_id) == kernel:
+                return state_id, False
+            if data in self._kernel_collisions:
+                return self._kernel_collisions[data], False
+        state_id = len(self._kernel_offsets) - 1
+        if key in self._kernel_index:
+            self._kernel_collisions[data] = state_id
+        else:
+            self._kernel_index[key] = state_id
+        self._kernel_items.extend(kernel)
+        self._kernel_offsets.append(len(self._kernel_items))
+        return state_id, True
+
+    def _start_kernel(self):
+        start_number = self._get_prod_number(self.start_symbol, self.productions[self.start_symbol][0])
+        return array('I', [self._item_base[start_number]])
 
     def _build_states(self):
-        start_item = (self.start_symbol, self.productions[self.start_symbol][0], 0)
-        start_closure = self._closure({start_item})
-        self.states.append(start_closure)
-        state_map = {start_closure: 0}
+        if self.workers and self.workers > 1:
+            self._build_states_parallel()
+            return
 
+        self._add_kernel(self._start_kernel())
         i = 0
         while i < len(self.states):
-            state = self.states[i]
-            symbols = {rhs[dot] for (lhs, rhs, dot) in state if dot < len(rhs)}
-
-            for symbol in symbols:
-                next_state = self._goto(state, symbol)
-                if next_state:
-                    if next_state not in state_map:
-                        self.states.append(next_state)
-                        state_map[next_state] = len(self.states) - 1
-                    self.transitions[(i, symbol)] = state_map[next_state]
+            closure = closure_ids(self.kernel(i), self._item_info, self._start_items)
+            # Successors come sorted by symbol so state numbering is deterministic
+            for symbol, kernel in successor_kernels(closure, self._item_info):
+                self.transitions[(i, symbol)], _ = self._add_kernel(kernel)
             i += 1
 
+    def _build_states_parallel(self):
+        """
+        Level-by-level BFS over the LR(0) automaton. Each frontier is split
+        among worker processes, which compute closures and successor kernels;
+        the parent merges the kernels through the kernel index. States are
+        numbered in (parent state, symbol) order, so the result matches the
+        sequential construction for any number of workers.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        self._add_kernel(self._start_kernel())
+        frontier = [0]
+
+        with ProcessPoolExecutor(max_workers=self.workers,
+                                 initializer=_init_state_worker,
+                                 initargs=(self._item_info, self._start_items)) as pool:
+            while frontier:
+                chunk_size = max(1, len(frontier) // (self.workers * 4))
+                chunks = [[self.kernel(state_id) for state_id in frontier[i:i + chunk_size]]
+                          for i in range(0, len(frontier), chunk_size)]
+                next_frontier = []
+                state_ids = iter(frontier)
+                for results in pool.map(_expand_kernels, chunks):
+                    for successors in results:
+                        state_id = next(state_ids)
+                        for symbol, kernel in successors:
+                            target, is_new = self._add_kernel(kernel)
+                            if is_new:
+                                next_frontier.append(target)
+                            self.transitions[(state_id, symbol)] = target
+                frontier = next_frontier
+
     def print_states(self):
         print("\n" + color_text("STATES", TableColors.YELLOW, bold=True))
         state_data = []
-        for idx, state in enumerate(self.states):
+        for idx in range(len(self.states)):
             state_items = []
-            for lhs, rhs, dot in state:
+            for lhs, rhs, dot in self.state_items(idx):
                 before_dot = ' '.join(rhs[:dot])
                 after_dot = ' '.join(rhs[dot:])
                 state_items.append(f"{lhs} → {before_dot} • {after_dot}")
@@ -84,12 +213,8 @@ class SyntaxAnalyzer:  # antes era SLRParser
         print(create_fancy_table(state_data, ["State", "Items"], "STATE INFORMATION"))
 
     def _get_prod_number(self, lhs, rhs):
-        index = 1
-        for nt, prods in self.productions.items():
-            for prod in prods:
-                if nt == lhs and prod == rhs:
-                    return index
-                index += 1
+        if (lhs, rhs) in self._prod_numbers:
+            return self._prod_numbers[(lhs, rhs)]
         raise ValueError(f"Production not found for {lhs} -> {rhs}")
 
     def print_reductions(self):
@@ -108,6 +233,27 @@ class SyntaxAnalyzer:  # antes era SLRParser
                                       ["State", "Production", "Reduction"],
                                       "REDUCTION INFORMATION"))
 
+    def _production_precedence(self, rhs):
+        # As in yacc: the precedence of the last terminal with a declared precedence
+        for sym in reversed(rhs):
+            if sym in self.precedence:
+                return self.precedence[sym]
+        return None
+
+    def _resolve_shift_reduce(self, symbol, rhs):
+        """
+        Resolves a shift/reduce conflict on symbol against a reduction by rhs.
+        Returns 'shift', 'reduce', 'error' (nonassoc), or None when either
+        side has no declared precedence.
+        """
+        prod_prec = self._production_precedence(rhs)
+        if prod_prec is None or symbol not in self.precedence:
+            return None
+        sym_level, assoc = self.precedence[symbol]
+        if prod_prec[0] != sym_level:
+            return 'reduce' if prod_prec[0] > sym_level else 'shift'
+        return {'left': 'reduce', 'right': 'shift', 'nonassoc': 'error'}[assoc]
+
     def build_slr_table(self):
         table = {}
         for state_id, state in enumerate(self.states):
@@ -131,6 +277,12 @@ class SyntaxAnalyzer:  # antes era SLRParser
                     for follow_sym in self.follow[lhs]:
                         if follow_sym not in table[state_id]:
                             table[state_id][follow_sym] = f"r{prod_num}"
+                        elif table[state_id][follow_sym].startswith('s'):
+                            resolution = self._resolve_shift_reduce(follow_sym, rhs)
+                            if resolution == 'reduce':
+                                table[state_id][follow_sym] = f"r{prod_num}"
+                            elif resolution == 'error':
+                                del table[state_id][follow_sym]
 
             #Reductions by empty: if a non-terminal symbol with production ε is expected
             for lhs, rhs, dot in state:
@@ -166,9 +318,10 @@ class SyntaxAnalyzer:  # antes era SLRParser
                         for follow_sym in self.follow[lhs]:
                             reduce_symbols[follow_sym].append((lhs, rhs, prod_num))
 
-            #Check shift-reduce conflicts
+            #Check shift-reduce conflicts not resolved by precedence declarations
             for sym in shift_symbols:
-                if sym in reduce_symbols:
+                if sym in reduce_symbols and any(
+                        self._resolve_shift_reduce(sym, rhs) is None for lhs, rhs, prod_num in reduce_symbols[sym]):
                     conflicts.append(
                         f"Shift-reduce conflict in state {state_id} for the symbol '{sym}': "
                         f"It can be moved or reduced with {reduce_symbols[sym]}"
@@ -201,86 +354,188 @@ class SyntaxAnalyzer:  # antes era SLRParser
         print("\n" + create_fancy_table(rows, headers, "SLR PARSING TABLE"))
 
     
-    def validate_input(self, input_string):
-        table = self.build_slr_table()
+    def _build_unit_gotos(self, table):
+        """
+        Pre-composes goto chains through unit productions. For a goto from
+        state p on X into state r, if r reduces by a unit production A -> X
+        on lookahead t, the parser would pop r and go to goto(p, A) without
+        consuming input; the chain is followed until a non-unit action.
+
+        Returns:
+            dict: (p, X, t) -> final state, only for chains that skip a state
+        """
+        unit_gotos = {}
+        for state_id, row in table.items():
+            for nt, target in row.items():
+                if nt not in self.non_terminals:
+                    continue
+                target = int(target)
+                for lookahead, action in table[target].items():
+                    if lookahead in self.non_terminals:
+                        continue
+                    final, seen = target, {target}
+                    while action.startswith('r'):
+                        lhs, rhs = self.numbered_productions[int(action[1:])]
+                        if len(rhs) != 1 or rhs[0] not in self.non_terminals:
+                            break
+                        next_state = table[state_id].get(lhs)
+                        if not next_state or int(next_state) in seen:
+                            break
+                        final = int(next_state)
+                        seen.add(final)
+                        action = table[final].get(lookahead, '')
+                    if final != target:
+                        unit_gotos[(state_id, nt, lookahead)] = final
+        return unit_gotos
+
+    def state_symbols(self):
+        """Accessing symbol of every state (the symbol before the dot in its kernel)."""
+        if self._state_symbols is None:
+            self._state_symbols = [None]
+            for state_id in range(1, len(self.states)):
+                lhs, rhs, dot = self._item_info[self.kernel(state_id)[0]]
+                self._state_symbols.append(rhs[dot - 1])
+        return self._state_symbols
+
+    def validate_input(self, input_string, trace=True, verbose=False):
+        """
+        Returns True if the input is accepted. Nothing is printed unless
+        verbose is set, in which case the input, the trace table and the
+        verdict are shown.
+        """
+        # Closures are rebuilt from kernels on demand, so the table is built once
+        if self._slr_table is None:
+            self._slr_table = self.build_slr_table()
+            if self.eliminate_units:
+                self._unit_gotos = self._build_unit_gotos(self._slr_table)
+        table = self._slr_table
+        unit_gotos = self._unit_gotos
         stack = [0]  # Stack de estados
-        symbols = []  # Stack de símbolos
         input_string += '$'
         pointer = 0
-        
-        steps = []
-        print(f"\n{color_text('Analyzing Input:', TableColors.BLUE, bold=True)} {color_text(input_string[:-1], TableColors.CYAN)}")
-        
+
+        steps = ParseTrace('slr', input_string, self.numbered_productions,
+                           state_symbols=self.state_symbols()) if trace else None
+        self.last_trace = steps
+        if verbose:
+            print(f"\n{color_text('Analyzing Input:', TableColors.BLUE, bold=True)} {color_text(input_string[:-1], TableColors.CYAN)}")
+
         while True:
             state = stack[-1]
             current = input_string[pointer]
-            
-            # Formar la representación del stack para mostrar
-            stack_symbols = ''.join(symbols)
-            stack_str = f"{stack_symbols} {state}"
-            
+
             action = table.get(state, {}).get(current, '')
-            steps.append([
-                color_text(str(len(steps)+1), TableColors.MAGENTA),
-                color_text(stack_str, TableColors.CYAN),
-                color_text(input_string[pointer:], TableColors.GREEN),
-                color_text(action, TableColors.YELLOW)
-            ])
-            
+
             if not action:
-                print(create_fancy_table(steps, 
-                    ["STEP", "STACK", "INPUT", "ACTION"], 
-                    "PARSING STEPS"))
-                print(f"\n{color_text('❌ NO', TableColors.RED, bold=True)} - Syntax Error")
+                if steps is not None:
+                    steps.record(ERROR, len(stack), pointer, 0, state)
+                if verbose:
+                    self._print_verdict(steps, False)
                 return False
-                
+
             if action == 'acc':
-                print(create_fancy_table(steps, 
-                    ["STEP", "STACK", "INPUT", "ACTION"], 
-                    "PARSING STEPS"))
-                print(f"\n{color_text('✓ YES', TableColors.GREEN, bold=True)} - Input Accepted")
+                if steps is not None:
+                    steps.record(ACCEPT, len(stack), pointer, 0, state)
+                if verbose:
+                    self._print_verdict(steps, True)
                 return True
-                
+
             if action.startswith('s'):  # Shift
                 next_state = int(action[1:])
+                if steps is not None:
+                    steps.record(SHIFT, len(stack), pointer, next_state, state)
                 stack.append(next_state)
-                symbols.append(current)
                 pointer += 1
-                
+
             elif action.startswith('r'):  # Reduce
                 prod_num = int(action[1:])
-                # Encontrar la producción correspondiente
-                found = False
-                for nt, prods in self.productions.items():
-                    for prod in prods:
-                        prod_num -= 1
-                        if prod_num == 0:
-                            # Reducir usando esta producción
-                            if prod != ('e',):
-                                for _ in range(len(prod)):
-                                    stack.pop()
-                                    symbols.pop()
-                            # Ir al siguiente estado
-                            goto_state = table[stack[-1]].get(nt, '')
-                            if goto_state:
-                                stack.append(int(goto_state))
-                                symbols.append(nt)
-                            found = True
-                            break
-                    if found:
-                        break
+                if steps is not None:
+                    steps.record(REDUCE, len(stack), pointer, prod_num, state)
+                nt, prod = self.numbered_productions[prod_num]
+                # Reducir usando esta producción
+                if prod != ('e',):
+                    del stack[len(stack) - len(prod):]
+                # Ir al siguiente estado
+                if unit_gotos and (stack[-1], nt, current) in unit_gotos:
+                    stack.append(unit_gotos[(stack[-1], nt, current)])
+                    continue
+                goto_state = table[stack[-1]].get(nt, '')
+                if goto_state:
+                    stack.append(int(goto_state))
+
+    def _print_verdict(self, steps, valid):
+        if steps is not None:
+            print(create_trace_table(steps, "PARSING STEPS"))
+        if valid:
+            print(f"\n{color_text('✓ YES', TableColors.GREEN, bold=True)} - Input Accepted")
+        else:
+            print(f"\n{color_text('❌ NO', TableColors.RED, bold=True)} - Syntax Error")
 
-def load_grammar(file):
-    with open(file) as f:
-        lines = [l.strip() for l in f if l.strip()]
+    def _build_byte_tables(self):
+        # Per state: {byte code: (SHIFT, target) | (REDUCE, lhs, symbols to pop) | (ACCEPT,)} and {nt: target}.
+        # With eliminate_units, gotos also hold {(nt, byte code): target} for pre-composed unit chains.
+        table = self.build_slr_table()
+        actions = [{} for _ in self.states]
+        gotos = [{} for _ in self.states]
+        if self.eliminate_units:
+            for (state_id, nt, lookahead), target in self._build_unit_gotos(table).items():
+                gotos[state_id][(nt, terminal_code(lookahead))] = target
+        for state_id, row in table.items():
+            for sym, action in row.items():
+                if sym in self.non_terminals:
+                    gotos[state_id][sym] = int(action)
+                elif action == 'acc':
+                    actions[state_id][terminal_code(sym)] = (ACCEPT,)
+                elif action.startswith('s'):
+                    actions[state_id][terminal_code(sym)] = (SHIFT, int(action[1:]))
+                else:
+                    lhs, rhs = self.numbered_productions[int(action[1:])]
+                    actions[state_id][terminal_code(sym)] = (REDUCE, lhs, 0 if rhs == ('e',) else len(rhs))
+        return actions, gotos
+
+    def validate_file(self, file_path):
+        """
+        Validates the contents of file_path as a single input string without
+        reading it into memory: the file is memory-mapped and tokens are
+        matched as bytes, so every terminal must be a single byte.
+        """
+        if self._byte_tables is None:
+            self._byte_tables = self._build_byte_tables()
+        actions, gotos = self._byte_tables
+        units = self.eliminate_units
+
+        with mapped_input(file_path) as (data, pos, end):
+            stack = [0]
+            while True:
+                current = data[pos] if pos < end else END
+                action = actions[stack[-1]].get(current)
+                if action is None:
+                    return False
+                if action[0] == SHIFT:
+                    stack.append(action[1])
+                    pos += 1
+                elif action[0] == REDUCE:
+                    if action[2]:
+                        del stack[-action[2]:]
+                    goto_state = None
+                    if units:
+                        goto_state = gotos[stack[-1]].get((action[1], current))
+                    if goto_state is None:
+                        goto_state = gotos[stack[-1]].get(action[1])
+                    if goto_state is None:
+                        return False
+                    stack.append(goto_state)
+                else:
+                    return True
 
-    num_rules = int(lines[0])
+def load_grammar(file):
+    num_rules, production_lines, input_strings, declarations = read_grammar_lines(file)
     prods = defaultdict(list)
     start = None
 
-    for i in range(1, num_rules + 1):
-        if '->' in lines[i]:
-            lhs, rhs = lines[i].split('->')
+    for line in production_lines:
+        if '->' in line:
+            lhs, rhs = line.split('->')
             lhs = lhs.strip()
             rhs_parts = rhs.strip().split()  #Separation by spaces
 
@@ -297,8 +552,7 @@ def load_grammar(file):
             if start is None:
                 start = lhs
 
-    input_strings = lines[num_rules + 1:]
-    return prods, start, input_strings
+    return prods, start, input_strings, parse_precedence(declarations)
 
 if __name__ == "__main__":
     import sys
@@ -307,8 +561,11 @@ if __name__ == "__main__":
         print("Uso: python S.py g.txt")
         sys.exit(1)
 
-    prods, start, cadenas = load_grammar(sys.argv[1])
-    parser = SyntaxAnalyzer(prods, start)
+    init_colors()
+    prods, start, cadenas, precedence = load_grammar(sys.argv[1])
+    prods, report = normalize_grammar(prods, start)
+    print_normalization_report(report)
+    parser = SyntaxAnalyzer(prods, start, precedence=precedence)
     print_grammar(parser.productions)
     parser.print_states()
     print_first_follow(parser.productions, parser.non_terminals, parser.start_symbol)
@@ -316,6 +573,6 @@ if __name__ == "__main__":
     parser.print_reductions()
     parser.is_slr1()  
 
-    print(f"\nStrings to parse from the file: {cadenas}")
+    print("\nStrings to parse from the file:")
     for cadena in cadenas:
-        parser.validate_input(cadena)
\ No newline at end of file
+        parser.validate_input(cadena, verbose=True)
\ No newline at end of file
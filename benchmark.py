@@ -0,0 +1,206 @@
+import os
+import random
+import sys
+import time
+
+from F import LL1Analyzer
+from S import SyntaxAnalyzer
+from E import EarleyAnalyzer
+from table_utils import create_fancy_table
+from trace_utils import REDUCE
+from shared_tables import compile_ll1, compile_slr
+
+# Grammars that are both LL(1) and SLR(1), so every engine can run them
+GRAMMARS = {
+    'expr': ({
+        'E': [['T', 'X']],
+        'X': [['+', 'T', 'X'], ['e']],
+        'T': [['F', 'Y']],
+        'Y': [['*', 'F', 'Y'], ['e']],
+        'F': [['(', 'E', ')'], ['a']],
+    }, 'E'),
+    'lists': ({
+        'S': [['[', 'L', ']']],
+        'L': [['a', 'M'], ['S', 'M'], ['e']],
+        'M': [[',', 'N'], ['e']],
+        'N': [['a', 'M'], ['S', 'M']],
+    }, 'S'),
+}
+
+
+ETF_CHAIN = {
+    'E': [['E', '+', 'T'], ['T']],
+    'T': [['T', '*', 'F'], ['F']],
+    'F': [['(', 'E', ')'], ['a']],
+}
+
+# The same expression language as an E/T/F chain (with and without unit
+# reductions) and in the compact ambiguous form resolved with precedence
+# declarations, as (productions, start symbol, SyntaxAnalyzer options)
+SLR_VARIANTS = {
+    'E/T/F chain': (ETF_CHAIN, 'E', {}),
+    'E/T/F chain, no unit reductions': (ETF_CHAIN, 'E', {'eliminate_units': True}),
+    'precedence': ({
+        'E': [['E', '+', 'E'], ['E', '*', 'E'], ['(', 'E', ')'], ['a']],
+    }, 'E', {'precedence': {'+': (1, 'left'), '*': (2, 'left')}}),
+}
+
+
+def make_large_grammar(size, seed=0):
+    """
+    Random grammar with size non-terminals N0..N{size-1} and 2 * size
+    terminals, for timing the LR(0) construction (about 7000 states for
+    size=1000). Each N{i} only refers to N{j} with j >= i.
+    """
+    rng = random.Random(seed)
+    non_terminals = [f"N{i}" for i in range(size)]
+    terminals = [f"t{i}" for i in range(2 * size)]
+    productions = {}
+    for i, nt in enumerate(non_terminals):
+        alternatives = []
+        for _ in range(4):
+            length = rng.randint(2, 6)
+            alternatives.append([rng.choice(terminals) if rng.random() < 0.6 else rng.choice(non_terminals[i:])
+                                 for _ in range(length)])
+        alternatives.append([rng.choice(terminals)])
+        productions[nt] = alternatives
+    return productions, 'N0'
+
+
+def random_expr(rng, size):
+    if size <= 1:
+        return 'a'
+    if rng.random() < 0.2:
+        return '(' + random_expr(rng, size - 2) + ')'
+    left = rng.randint(1, size - 1)
+    return random_expr(rng, left) + rng.choice('+*') + random_expr(rng, size - left)
+
+
+def random_list(rng, size):
+    items = []
+    while size > 0:
+        if size > 2 and rng.random() < 0.3:
+            inner = rng.randint(1, size - 1)
+            items.append(random_list(rng, inner))
+            size -= inner
+        else:
+            items.append('a')
+            size -= 1
+    return '[' + ','.join(items) + ']'
+
+
+GENERATORS = {'expr': random_expr, 'lists': random_list}
+
+
+def make_inputs(name, count, size, seed=0):
+    rng = random.Random(seed)
+    return [GENERATORS[name](rng, size) for _ in range(count)]
+
+
+def engines(productions, start):
+    """Returns (engine name, validate function) for every engine."""
+    ll1 = LL1Analyzer(productions, start)
+    slr = SyntaxAnalyzer(productions, start)
+    earley = EarleyAnalyzer(productions, start)
+    ll1_compiled = compile_ll1(ll1)
+    slr_compiled = compile_slr(slr)
+    return [
+        ('LL(1)', lambda s: ll1.validate_string(s, trace=False)[0]),
+        ('LL(1) compiled', ll1_compiled.validate),
+        ('SLR(1)', lambda s: slr.validate_input(s, trace=False)),
+        ('SLR(1) compiled', slr_compiled.validate),
+        ('Earley', lambda s: earley.validate_string(s)[0]),
+    ]
+
+
+def time_engine(validate, inputs):
+    """Validates every input; returns (seconds, accepted count)."""
+    accepted = 0
+    start = time.perf_counter()
+    for string in inputs:
+        accepted += bool(validate(string))
+    elapsed = time.perf_counter() - start
+    return elapsed, accepted
+
+
+def calibrate_engines(engines, sample, rounds=3):
+    """
+    Times every engine on the sample strings, keeping the best of a few rounds.
+
+    Args:
+        engines: list of (name, validate) pairs
+    Returns:
+        list: (name, seconds per token) pairs, fastest first
+    """
+    tokens = max(1, sum(len(string) for string in sample))
+    costs = []
+    for name, validate in engines:
+        best = min(time_engine(validate, sample)[0] for _ in range(rounds))
+        costs.append((name, best / tokens))
+    return sorted(costs, key=lambda cost: cost[1])
+
+
+def bench_engines(count=50, size=200):
+    rows = []
+    for name, (productions, start) in GRAMMARS.items():
+        inputs = make_inputs(name, count, size)
+        tokens = sum(len(s) for s in inputs)
+        for engine, validate in engines(productions, start):
+            elapsed, accepted = time_engine(validate, inputs)
+            rows.append([name, engine, f"{accepted}/{len(inputs)}",
+                         f"{elapsed * 1000:.1f}", f"{elapsed * 1e6 / tokens:.2f}"])
+    print(create_fancy_table(rows, ["Grammar", "Engine", "Accepted", "Total ms", "µs/token"],
+                             "ENGINE BENCHMARK"))
+
+
+def slr_step_counts(parser, inputs):
+    """Returns (total steps, total reductions) of the SLR driver over inputs."""
+    steps = reductions = 0
+    for string in inputs:
+        parser.validate_input(string)
+        steps += len(parser.last_trace)
+        reductions += sum(1 for record in parser.last_trace if record[1] == REDUCE)
+    return steps, reductions
+
+
+def bench_slr_variants(count=50, size=200):
+    inputs = make_inputs('expr', count, size)
+    tokens = sum(len(s) for s in inputs)
+    rows = []
+    for name, (productions, start, options) in SLR_VARIANTS.items():
+        parser = SyntaxAnalyzer(productions, start, **options)
+        steps, reductions = slr_step_counts(parser, inputs)
+        elapsed, accepted = time_engine(lambda s: parser.validate_input(s, trace=False), inputs)
+        rows.append([name, len(parser.states), f"{accepted}/{len(inputs)}",
+                     f"{steps / tokens:.2f}", f"{reductions / tokens:.2f}", f"{elapsed * 1e6 / tokens:.2f}"])
+    print(create_fancy_table(rows, ["Grammar", "States", "Accepted", "Steps/token", "Reductions/token", "µs/token"],
+                             "SLR(1) GRAMMAR VARIANTS"))
+
+
+def bench_state_construction(size=1000, workers=(2, 4), rounds=3):
+    """LR(0) construction time of a large grammar, sequential and with each number of workers."""
+    productions, start = make_large_grammar(size)
+    rows = []
+    sequential = None
+    for count in (None,) + tuple(workers):
+        best = float('inf')
+        for _ in range(rounds):
+            begin = time.perf_counter()
+            parser = SyntaxAnalyzer(productions, start, workers=count)
+            best = min(best, time.perf_counter() - begin)
+        if sequential is None:
+            sequential, transitions = best, parser.transitions
+        elif parser.transitions != transitions:
+            raise AssertionError(f"workers={count} built a different automaton")
+        rows.append(["sequential" if count is None else f"{count} workers", len(parser.states),
+                     f"{best:.2f}", f"{sequential / best:.2f}x"])
+    print(create_fancy_table(rows, ["Build", "States", "Seconds", "Speedup"],
+                             f"LR(0) CONSTRUCTION ({size} non-terminals, {os.cpu_count()} CPUs)"))
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    bench_engines(count, size)
+    bench_slr_variants(count, size)
+    bench_state_construction()
@@ -0,0 +1,77 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+
+def grammar_fingerprint(productions, start_symbol, engine, precedence=None):
+    """Stable hash of everything that decides a verdict: engine, start symbol, productions and precedence."""
+    canonical = {
+        'engine': engine,
+        'start': start_symbol,
+        'productions': [[nt, [list(prod) for prod in productions[nt]]] for nt in sorted(productions)],
+        'precedence': sorted((precedence or {}).items()),
+    }
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True).encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Bounded LRU cache of recognition verdicts keyed by (grammar fingerprint,
+    input string). Verdicts are (valid, message) pairs. The cache can be
+    saved next to the grammar file and loaded on the next run.
+    """
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, fingerprint, input_string):
+        key = (fingerprint, input_string)
+        verdict = self.entries.get(key)
+        if verdict is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return verdict
+
+    def put(self, fingerprint, input_string, valid, message):
+        key = (fingerprint, input_string)
+        self.entries[key] = (valid, message)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def validate(self, fingerprint, input_string, validate):
+        """
+        Returns (valid, message, cached). On a miss, validate(input_string)
+        is called and must return (valid, message).
+        """
+        verdict = self.get(fingerprint, input_string)
+        if verdict is not None:
+            return verdict[0], verdict[1], True
+        valid, message = validate(input_string)
+        self.put(fingerprint, input_string, valid, message)
+        return valid, message, False
+
+    def save(self, path):
+        # Least recently used first, so loading restores the same order
+        with open(path, 'w') as f:
+            for (fingerprint, input_string), (valid, message) in self.entries.items():
+                f.write(json.dumps([fingerprint, input_string, valid, message]) + '\n')
+
+    def load(self, path):
+        if not os.path.exists(path):
+            return
+        with open(path) as f:
+            for line in f:
+                fingerprint, input_string, valid, message = json.loads(line)
+                self.put(fingerprint, input_string, valid, message)
+
+
+def cache_path(grammar_file):
+    """Location of the persisted cache for a grammar file."""
+    return grammar_file + '.cache'
@@ -1,6 +1,66 @@
 from collections import defaultdict
 
 
+def read_grammar_lines(file_path):
+    """
+    Reads the header of a grammar file eagerly and the test strings lazily.
+    The header may start with precedence declarations (lines beginning with
+    '%', see parse_precedence) before the number of productions.
+
+    Returns:
+        tuple: (num_productions, production_lines, test_strings, declarations)
+            - test_strings: generator over the remaining non-empty lines; the
+              file is reopened at the saved offset only when it is consumed
+            - declarations: the precedence declaration lines
+    """
+    declarations = []
+    with open(file_path, 'r') as f:
+        line = f.readline()
+        while line and (not line.strip() or line.strip().startswith('%')):
+            if line.strip():
+                declarations.append(line.strip())
+            line = f.readline()
+        num_productions = int(line)
+
+        production_lines = []
+        while len(production_lines) < num_productions:
+            line = f.readline()
+            if not line:
+                break
+            if line.strip():
+                production_lines.append(line.strip())
+        offset = f.tell()
+
+    def test_strings():
+        with open(file_path, 'r') as f:
+            f.seek(offset)
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield line
+
+    return num_productions, production_lines, test_strings(), declarations
+
+
+def parse_precedence(declarations):
+    """
+    Parses yacc-style declarations such as '%left + -', '%right ^' or
+    '%nonassoc <'. Each line is one precedence level, lowest first.
+
+    Returns:
+        dict: terminal -> (level, associativity)
+    """
+    precedence = {}
+    for level, line in enumerate(declarations, start=1):
+        parts = line.split()
+        assoc = parts[0][1:]
+        if assoc not in ('left', 'right', 'nonassoc'):
+            raise ValueError(f"Unknown precedence declaration: {parts[0]}")
+        for terminal in parts[1:]:
+            precedence[terminal] = (level, assoc)
+    return precedence
+
+
 def compute_terminals(productions, non_terminals):
     terminals = set()
     for rhs_list in productions.values():
@@ -102,6 +162,99 @@ def compute_follow(productions, non_terminals, start_symbol, first):
                                 changed = True
     return follow
 
+def normalize_grammar(productions, start_symbol):
+    """
+    Removes the parts of a grammar that can never take part in a derivation,
+    so the analyzers build FIRST/FOLLOW sets, automata and tables only over
+    useful symbols:
+    1. Redundant epsilons inside alternatives ('a e' -> 'a', 'e e' -> 'e')
+    2. Duplicate alternatives of the same non-terminal
+    3. Non-productive non-terminals (they never derive a terminal string)
+    4. Non-terminals unreachable from the start symbol
+
+    Productions keep their original container type (lists for F, tuples for S).
+
+    Returns:
+        tuple: (normalized_productions, report)
+            - report: dict with the removed 'epsilons', 'duplicates',
+              'non_productive' and 'unreachable' entries
+    """
+    non_terminals = set(productions.keys())
+    report = {'epsilons': [], 'duplicates': [], 'non_productive': [], 'unreachable': []}
+
+    # 1 and 2: clean up and deduplicate alternatives
+    cleaned = {}
+    for nt, prods in productions.items():
+        seen = set()
+        cleaned[nt] = []
+        for prod in prods:
+            kind = type(prod)
+            symbols = [sym for sym in prod if sym != 'e'] or ['e']
+            if len(symbols) != len(prod):
+                report['epsilons'].append((nt, prod))
+            key = tuple(symbols)
+            if key in seen:
+                report['duplicates'].append((nt, prod))
+                continue
+            seen.add(key)
+            cleaned[nt].append(kind(symbols))
+
+    # 3: productive non-terminals, computed as a fixed point
+    productive = set()
+    changed = True
+    while changed:
+        changed = False
+        for nt, prods in cleaned.items():
+            if nt in productive:
+                continue
+            for prod in prods:
+                if all(sym not in non_terminals or sym in productive for sym in prod):
+                    productive.add(nt)
+                    changed = True
+                    break
+
+    if start_symbol not in productive:
+        raise ValueError(f"Start symbol {start_symbol} does not derive any terminal string")
+
+    report['non_productive'] = sorted(non_terminals - productive)
+    useful = {
+        nt: [prod for prod in prods if all(sym not in non_terminals or sym in productive for sym in prod)]
+        for nt, prods in cleaned.items() if nt in productive
+    }
+
+    # 4: reachable non-terminals from the start symbol
+    reachable = {start_symbol}
+    pending = [start_symbol]
+    while pending:
+        nt = pending.pop()
+        for prod in useful[nt]:
+            for sym in prod:
+                if sym in useful and sym not in reachable:
+                    reachable.add(sym)
+                    pending.append(sym)
+
+    report['unreachable'] = sorted(set(useful) - reachable)
+    normalized = defaultdict(list)
+    for nt, prods in useful.items():
+        if nt in reachable:
+            normalized[nt] = prods
+    return normalized, report
+
+
+def print_normalization_report(report):
+    if not any(report.values()):
+        return
+    print("\n***** GRAMMAR NORMALIZATION *****")
+    for nt, prod in report['epsilons']:
+        print(f"  Redundant ε removed: {nt} → {' '.join(prod)}")
+    for nt, prod in report['duplicates']:
+        print(f"  Duplicate alternative removed: {nt} → {' '.join(prod)}")
+    for nt in report['non_productive']:
+        print(f"  Non-productive non-terminal removed: {nt}")
+    for nt in report['unreachable']:
+        print(f"  Unreachable non-terminal removed: {nt}")
+
+
 def print_grammar(productions):
     print("\n***** GRAMMAR *****")
     for nt in sorted(productions.keys()):
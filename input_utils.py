@@ -0,0 +1,43 @@
+import mmap
+import os
+from contextlib import contextmanager
+
+# Token code for the end of input ('$' in the parsing tables)
+END = -1
+
+_WHITESPACE = frozenset(b' \t\r\n\x0b\x0c')
+
+
+def terminal_code(symbol):
+    """Byte value used to match a grammar terminal against a byte buffer."""
+    if symbol == '$':
+        return END
+    encoded = symbol.encode()
+    if len(encoded) != 1:
+        raise ValueError(f"Terminal '{symbol}' is not a single byte and cannot be matched in byte mode")
+    return encoded[0]
+
+
+@contextmanager
+def mapped_input(path):
+    """
+    Memory-maps an input file read-only and yields (view, start, end), where
+    view is a memoryview over the mapping and [start, end) are the bounds of
+    the input without surrounding whitespace. Nothing is copied, so inputs
+    larger than RAM can be validated; indexing the view gives byte values.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield memoryview(b''), 0, 0
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                start, end = 0, len(view)
+                while start < end and view[start] in _WHITESPACE:
+                    start += 1
+                while end > start and view[end - 1] in _WHITESPACE:
+                    end -= 1
+                yield view, start, end
+            finally:
+                view.release()
@@ -0,0 +1,268 @@
+import mmap
+from array import array
+
+from input_utils import mapped_input, terminal_code
+
+# Flat int32 layout shared by both engines:
+#   header[HEADER_SIZE] | byte_columns[257] | engine sections...
+# byte_columns maps a byte value (256 = end of input) to its terminal
+# column, or -1 when the byte is not a terminal of the grammar.
+MAGIC = 0x5441424C
+SLR_KIND = 1
+LL1_KIND = 2
+HEADER_SIZE = 16
+BYTE_COLUMNS = 257
+END_COLUMN_CODE = 256
+
+# Header fields
+H_MAGIC, H_KIND, H_ROWS, H_COLS, H_NTS, H_PRODS, H_START = range(7)
+H_SECTIONS = 8  # Section offsets start here
+
+# SLR action cells: (argument << 2) | kind
+A_ERROR, A_SHIFT, A_REDUCE, A_ACCEPT = range(4)
+
+
+def _byte_columns(terminals):
+    columns = [-1] * BYTE_COLUMNS
+    for index, terminal in enumerate(terminals):
+        code = terminal_code(terminal)
+        columns[END_COLUMN_CODE if code < 0 else code] = index
+    return columns
+
+
+def _assemble(kind, rows, cols, nts, prods, start, sections):
+    header = [0] * HEADER_SIZE
+    header[H_MAGIC], header[H_KIND] = MAGIC, kind
+    header[H_ROWS], header[H_COLS], header[H_NTS], header[H_PRODS], header[H_START] = rows, cols, nts, prods, start
+    data = array('i', header)
+    for index, section in enumerate(sections):
+        data[H_SECTIONS + index] = len(data)
+        data.extend(section)
+    return data
+
+
+def compile_slr(parser):
+    """
+    Encodes the SLR table of a SyntaxAnalyzer as a flat int array.
+
+    Sections: byte_columns, action[state * cols + column],
+    goto[state * nts + nt] (target + 1, 0 = none), and per production
+    number its lhs index and the number of states it pops.
+    """
+    table = parser.build_slr_table()
+    terminals = sorted(parser.terminals) + ['$']
+    column = {terminal: index for index, terminal in enumerate(terminals)}
+    non_terminals = sorted(parser.non_terminals)
+    nt_index = {nt: index for index, nt in enumerate(non_terminals)}
+    rows, cols, nts = len(parser.states), len(terminals), len(non_terminals)
+
+    actions = [A_ERROR] * (rows * cols)
+    gotos = [0] * (rows * nts)
+    for state_id, row in table.items():
+        for sym, action in row.items():
+            if sym in nt_index:
+                gotos[state_id * nts + nt_index[sym]] = int(action) + 1
+            elif action == 'acc':
+                actions[state_id * cols + column[sym]] = A_ACCEPT
+            elif action.startswith('s'):
+                actions[state_id * cols + column[sym]] = (int(action[1:]) << 2) | A_SHIFT
+            else:
+                actions[state_id * cols + column[sym]] = (int(action[1:]) << 2) | A_REDUCE
+
+    lhs = [0] * len(parser.numbered_productions)
+    lengths = [0] * len(parser.numbered_productions)
+    for number in range(1, len(parser.numbered_productions)):
+        nt, rhs = parser.numbered_productions[number]
+        lhs[number] = nt_index[nt]
+        lengths[number] = 0 if rhs == ('e',) else len(rhs)
+
+    return CompiledTable(_assemble(SLR_KIND, rows, cols, nts, len(lhs), 0,
+                                   [_byte_columns(terminals), actions, gotos, lhs, lengths]))
+
+
+def compile_ll1(analyzer):
+    """
+    Encodes the table of an LL1Analyzer as a flat int array.
+
+    Stack symbols are terminal columns (0..cols-1) or cols + nt index.
+    Sections: byte_columns, table[nt * cols + column] (production + 1,
+    0 = error), and the right-hand sides, reversed and encoded, as
+    offsets[p]..offsets[p + 1] into a symbol array.
+    """
+    if not analyzer.ll1_table:
+        raise ValueError("Grammar not LL(1)")
+    terminals = sorted(analyzer.terminals) + ['$']
+    column = {terminal: index for index, terminal in enumerate(terminals)}
+    non_terminals = sorted(analyzer.non_terminals)
+    nt_index = {nt: index for index, nt in enumerate(non_terminals)}
+    cols, nts = len(terminals), len(non_terminals)
+
+    def encode(sym):
+        return cols + nt_index[sym] if sym in nt_index else column[sym]
+
+    prods = [prod for nt, prod in analyzer.production_list]
+    offsets = [0]
+    symbols = []
+    for prod in prods:
+        if prod != ['e']:
+            symbols.extend(encode(sym) for sym in reversed(prod))
+        offsets.append(len(symbols))
+
+    cells = [0] * (nts * cols)
+    for (nt, term), prod in analyzer.ll1_table.items():
+        cells[nt_index[nt] * cols + column[term]] = analyzer._prod_ids[(nt, tuple(prod))] + 1
+
+    return CompiledTable(_assemble(LL1_KIND, nts, cols, nts, len(prods), encode(analyzer.start_symbol),
+                                   [_byte_columns(terminals), cells, offsets, symbols]))
+
+
+def _run_slr(t, data, pos, end):
+    cols, nts = t[H_COLS], t[H_NTS]
+    o_cols, o_action, o_goto, o_lhs, o_len = (t[H_SECTIONS + i] for i in range(5))
+    stack = [0]
+    while True:
+        column = t[o_cols + (data[pos] if pos < end else END_COLUMN_CODE)]
+        if column < 0:
+            return False
+        cell = t[o_action + stack[-1] * cols + column]
+        kind = cell & 3
+        if kind == A_SHIFT:
+            stack.append(cell >> 2)
+            pos += 1
+        elif kind == A_REDUCE:
+            prod = cell >> 2
+            if t[o_len + prod]:
+                del stack[-t[o_len + prod]:]
+            target = t[o_goto + stack[-1] * nts + t[o_lhs + prod]]
+            if not target:
+                return False
+            stack.append(target - 1)
+        else:
+            return kind == A_ACCEPT
+
+
+def _run_ll1(t, data, pos, end):
+    cols = t[H_COLS]
+    o_cols, o_table, o_offsets, o_symbols = (t[H_SECTIONS + i] for i in range(4))
+    stack = [t[o_cols + END_COLUMN_CODE], t[H_START]]
+    while stack:
+        top = stack.pop()
+        column = t[o_cols + (data[pos] if pos < end else END_COLUMN_CODE)]
+        if column < 0:
+            return False
+        if top < cols:
+            if top != column:
+                return False
+            pos += 1
+        else:
+            prod = t[o_table + (top - cols) * cols + column]
+            if not prod:
+                return False
+            stack.extend(t[o_symbols + t[o_offsets + prod - 1]:o_symbols + t[o_offsets + prod]])
+    return True
+
+
+class CompiledTable:
+    """
+    Parsing table in a flat int32 layout that the drivers read in place.
+    The data can be an array, or a memoryview over shared memory or a
+    memory-mapped file, so many processes can use one copy of the table.
+    """
+
+    def __init__(self, data, owner=None):
+        self.data = data
+        self._owner = owner  # SharedMemory or mmap kept alive while data is in use
+        if data[H_MAGIC] != MAGIC:
+            raise ValueError("Not a compiled parsing table")
+        self._run = _run_slr if data[H_KIND] == SLR_KIND else _run_ll1
+
+    def validate(self, input_string):
+        """Validates a str or bytes input; every terminal must be a single byte."""
+        if isinstance(input_string, str):
+            input_string = input_string.strip().encode()
+        return self._run(self.data, input_string, 0, len(input_string))
+
+    def validate_file(self, file_path):
+        with mapped_input(file_path) as (data, pos, end):
+            return self._run(self.data, data, pos, end)
+
+    def to_bytes(self):
+        return bytes(self.data)
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def open(cls, path):
+        """Memory-maps a saved table read-only; the pages are shared between processes."""
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(memoryview(mapped).cast('i'), mapped)
+
+    def to_shared_memory(self, name=None):
+        """
+        Copies the table into a new shared memory block once and returns
+        the SharedMemory; the caller closes and unlinks it when done.
+        """
+        from multiprocessing import shared_memory
+
+        raw = self.to_bytes()
+        block = shared_memory.SharedMemory(name=name, create=True, size=len(raw))
+        block.buf[:len(raw)] = raw
+        return block
+
+    @classmethod
+    def attach(cls, name):
+        """Attaches read-only to a table placed in shared memory, without copying it."""
+        from multiprocessing import shared_memory
+
+        try:
+            # Only the creator should unlink the block (track is available from Python 3.13)
+            block = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            block = shared_memory.SharedMemory(name=name)
+        size = block.buf.nbytes - block.buf.nbytes % array('i').itemsize
+        return cls(block.buf[:size].toreadonly().cast('i'), block)
+
+    def close(self):
+        if isinstance(self.data, memoryview):
+            self.data.release()
+        if self._owner is not None:
+            self._owner.close()
+            self._owner = None
+
+
+# Table attached by each worker of validate_parallel
+_worker_table = None
+
+
+def _init_table_worker(source):
+    global _worker_table
+    kind, location = source
+    _worker_table = CompiledTable.attach(location) if kind == 'shm' else CompiledTable.open(location)
+
+
+def _validate_chunk(strings):
+    return [_worker_table.validate(string) for string in strings]
+
+
+def validate_parallel(source, strings, workers, chunk_size=256):
+    """
+    Validates strings in a process pool where every worker attaches to the
+    same table instead of building its own.
+
+    Args:
+        source: ('shm', shared memory name) or ('file', path of a saved table)
+    Returns:
+        list: one verdict per string, in order
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    strings = list(strings)
+    chunks = [strings[i:i + chunk_size] for i in range(0, len(strings), chunk_size)]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_table_worker, initargs=(source,)) as pool:
+        for verdicts in pool.map(_validate_chunk, chunks):
+            results.extend(verdicts)
+    return results
@@ -1,6 +1,19 @@
-from tabulate import tabulate
-import colorama
-colorama.init()
+# tabulate and colorama are only imported when something is rendered, so the
+# analyzers can be imported from library code or worker processes without them
+_colors_ready = False
+
+
+def init_colors():
+    """Enables ANSI colors on the terminal (colorama is optional)."""
+    global _colors_ready
+    if _colors_ready:
+        return
+    _colors_ready = True
+    try:
+        import colorama
+    except ImportError:
+        return
+    colorama.init()
 
 class TableColors:
     # Colores básicos
@@ -26,6 +39,8 @@ def color_text(text, color, bold=False, underline=False):
     return f"{effects}{color}{text}{TableColors.RESET}"
 
 def create_fancy_table(data, headers, title=None):
+    from tabulate import tabulate
+    init_colors()
     colored_headers = [color_text(h, TableColors.CYAN, bold=True) for h in headers]
     
     table = tabulate(data, 
@@ -54,6 +69,7 @@ class TableStyles:
     }
 
 def create_result_box(result, message):
+    init_colors()
     symbol = TableStyles.SUCCESS if result else TableStyles.ERROR
     status = "YES" if result else "NO"
     box_width = max(len(message) + 4, 20)
@@ -63,4 +79,20 @@ def create_result_box(result, message):
 ║{symbol} Result: {status:<{box_width-10}}║
 ║  {message:<{box_width-2}}║
 ╚{'═' * box_width}╝
-    """)
\ No newline at end of file
+    """)
+
+def create_trace_table(trace, title, start=0, stop=None):
+    rows = []
+    for step, stack, remaining, action in trace.rows(start, stop):
+        row = [
+            color_text(str(step), TableColors.MAGENTA),
+            color_text(stack, TableColors.CYAN),
+            color_text(remaining, TableColors.GREEN)
+        ]
+        if trace.kind == 'slr':
+            row.append(color_text(action, TableColors.YELLOW))
+        rows.append(row)
+    headers = ["STEP", "STACK", "INPUT"]
+    if trace.kind == 'slr':
+        headers.append("ACTION")
+    return create_fancy_table(rows, headers, title)
@@ -0,0 +1,130 @@
+from array import array
+from itertools import islice
+
+# Action codes stored in each trace record
+MATCH = 0
+EXPAND = 1
+SHIFT = 2
+REDUCE = 3
+ACCEPT = 4
+ERROR = 5
+
+ACTION_NAMES = {
+    MATCH: 'match',
+    EXPAND: 'expand',
+    SHIFT: 'shift',
+    REDUCE: 'reduce',
+    ACCEPT: 'accept',
+    ERROR: 'error',
+}
+
+# step, action, stack depth, input position, argument, state
+RECORD_SIZE = 6
+
+
+class ParseTrace:
+    """
+    Compact trace of a parse run.
+
+    Every step is stored as a fixed-size record of integers in a flat array:
+    (step, action code, stack depth, input position, argument, state).
+    The argument is the production id for EXPAND/REDUCE and the target state
+    for SHIFT; state is the LR state on top of the stack (0 for LL(1)).
+
+    The stack/input view of each step is not stored; it is rebuilt lazily by
+    replaying the records from the beginning, so a trace costs O(n) memory
+    instead of O(n²) characters.
+    """
+
+    def __init__(self, kind, tokens, productions, start_symbol=None, state_symbols=None):
+        self.kind = kind                # 'll1' or 'slr'
+        self.tokens = tokens            # input tokens, ending with '$'
+        self.productions = productions  # production id -> (lhs, rhs)
+        self.start_symbol = start_symbol
+        self.state_symbols = state_symbols  # LR state -> accessing symbol
+        self.records = array('i')
+
+    def record(self, action, depth, pos, arg=0, state=0):
+        self.records.extend((len(self), action, depth, pos, arg, state))
+
+    def __len__(self):
+        return len(self.records) // RECORD_SIZE
+
+    def __iter__(self):
+        r = self.records
+        for i in range(0, len(r), RECORD_SIZE):
+            yield tuple(r[i:i + RECORD_SIZE])
+
+    def _replay_ll1(self):
+        stack = ['$', self.start_symbol]
+        for step, action, depth, pos, arg, state in self:
+            yield step, action, arg, state, stack, pos
+            if action == MATCH:
+                stack.pop()
+            elif action == EXPAND:
+                stack.pop()
+                rhs = self.productions[arg][1]
+                if tuple(rhs) != ('e',):
+                    stack.extend(reversed(rhs))
+
+    def _replay_slr(self):
+        # The symbol stack is derived from the state stack, so reductions the
+        # driver skipped (unit elimination) still replay correctly: after a
+        # reduction, the next record's state is the goto target.
+        symbols = []
+        pending_goto = False
+        for step, action, depth, pos, arg, state in self:
+            if pending_goto:
+                symbols.append(self.state_symbols[state])
+                pending_goto = False
+            yield step, action, arg, state, symbols, pos
+            if action == SHIFT:
+                symbols.append(self.state_symbols[arg])
+            elif action == REDUCE:
+                rhs = self.productions[arg][1]
+                if tuple(rhs) != ('e',):
+                    del symbols[len(symbols) - len(rhs):]
+                pending_goto = True
+
+    def _action_label(self, action, arg):
+        if self.kind == 'slr':
+            if action == SHIFT:
+                return f"s{arg}"
+            if action == REDUCE:
+                return f"r{arg}"
+            if action == ACCEPT:
+                return 'acc'
+            return ''
+        return ACTION_NAMES[action]
+
+    def rows(self, start=0, stop=None):
+        """
+        Rebuilds the display rows for steps [start, stop).
+
+        Rows are (step number, stack, remaining input, action). The replay
+        yields its live stack, so skipped steps only cost the stack update and
+        only the rows in the requested range are formatted.
+        """
+        if self.kind == 'slr':
+            for step, action, arg, state, symbols, pos in islice(self._replay_slr(), start, stop):
+                yield (step + 1, f"{''.join(symbols)} {state}", ''.join(self.tokens[pos:]),
+                       self._action_label(action, arg))
+        else:
+            for step, action, arg, state, stack, pos in islice(self._replay_ll1(), start, stop):
+                yield (step + 1, ' '.join(reversed(stack)), ' '.join(self.tokens[pos:]),
+                       self._action_label(action, arg))
+
+    def page(self, number, size=50):
+        return list(self.rows(number * size, (number + 1) * size))
+
+    def to_json(self, **kwargs):
+        import json
+
+        data = {
+            'kind': self.kind,
+            'steps': [
+                {'step': step, 'stack': stack, 'input': remaining, 'action': action}
+                for step, stack, remaining, action in self.rows()
+            ],
+        }
+        return json.dumps(data, ensure_ascii=False, **kwargs)